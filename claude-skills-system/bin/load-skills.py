@@ -7,19 +7,32 @@ Usage:
   load-skills.py                     # Load skills from current directory
   load-skills.py /path/to/project    # Load skills from specific project
   load-skills.py --json              # Output metadata in JSON format
+  load-skills.py --compact-json      # Output metadata as single-line JSON
 """
 
 import os
 import sys
-import json
-import re
 from pathlib import Path
-from typing import List, Dict, Set, Tuple, Optional
+from typing import Any, List, Dict, Iterator, Set, Tuple, Optional, Union
 
 # Configuration
 SKILLS_DIR = Path.home() / '.claude' / 'skills'
+_SKILLS_DIR_STR = str(SKILLS_DIR)
 SKILLS_FILE = '.claude-skills'
 SKILLS_JSON_FILE = '.claude-skills.json'
+SKILL_SEPARATOR = '\n\n---\n\n'
+READ_BUFFER_SIZE = 1 << 20
+# Below this many files per dependency level, thread startup costs more than it saves
+PREFETCH_MIN_SKILLS = 8
+
+# Parsed skill files keyed by skill name: (raw_content, frontmatter, content)
+_SKILL_CACHE: Dict[str, Tuple[bytes, Optional[Dict], bytes]] = {}
+
+# Pending stderr messages, written together by _flush_diagnostics()
+_DIAGNOSTICS: List[str] = []
+
+# DFS node states for dependency ordering
+_WHITE, _GRAY, _BLACK = 0, 1, 2
 
 # ANSI color codes for terminal output
 class Colors:
@@ -32,32 +45,93 @@ class Colors:
     GRAY = '\033[90m'
 
 
+# Leave escape codes out of redirected output and honour NO_COLOR
+if not (sys.stderr.isatty() and 'NO_COLOR' not in os.environ):
+    for _attr in ('RESET', 'BRIGHT', 'GREEN', 'RED', 'YELLOW', 'BLUE', 'GRAY'):
+        setattr(Colors, _attr, '')
+
+# Status markers for stderr messages
+_WARN = f"{Colors.YELLOW}⚠{Colors.RESET}"
+_OK = f"{Colors.GREEN}✓{Colors.RESET}"
+_ERR = f"{Colors.RED}✗{Colors.RESET}"
+
+
+def _report(message: str) -> None:
+    """Queue a diagnostic message for stderr"""
+    _DIAGNOSTICS.append(message + '\n')
+
+
+def _flush_diagnostics() -> None:
+    """Write all queued diagnostic messages to stderr in one call"""
+    if _DIAGNOSTICS:
+        sys.stderr.write(''.join(_DIAGNOSTICS))
+        sys.stderr.flush()
+        _DIAGNOSTICS.clear()
+
+
+def _read_bytes(path: Union[str, Path]) -> bytes:
+    """Read a whole file in binary mode with a large buffer"""
+    with open(path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        return f.read()
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Check for NaN or Infinity values, which orjson would write as null"""
+    if isinstance(obj, float):
+        return obj != obj or obj in (float('inf'), float('-inf'))
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, list):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+
+def _dumps(obj: Any, pretty: bool = True) -> str:
+    """Serialize to JSON, using orjson when it is installed and can represent obj"""
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    if orjson is not None and not _has_non_finite(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits echoed from .claude-skills.json
+            pass
+
+    import json
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
 def load_skills_config(project_path: Path) -> Optional[Dict]:
     """Load skills configuration from project"""
     # Try JSON format first
     json_path = project_path / SKILLS_JSON_FILE
     if json_path.exists():
+        # Config files are tiny, so importing orjson would cost more than it saves
+        import json
         try:
-            with open(json_path, 'r') as f:
-                config = json.load(f)
-                return {
-                    'skills': config.get('skills', []),
-                    'format': 'json',
-                    'config': config
-                }
-        except json.JSONDecodeError as e:
+            config = json.loads(_read_bytes(json_path))
+            return {
+                'skills': config.get('skills', []),
+                'format': 'json',
+                'config': config
+            }
+        except ValueError as e:
             print(f"{Colors.RED}✗ Error parsing {SKILLS_JSON_FILE}:{Colors.RESET} {e}", file=sys.stderr)
             sys.exit(1)
 
     # Try simple text format
     text_path = project_path / SKILLS_FILE
     if text_path.exists():
-        with open(text_path, 'r') as f:
-            skills = [
-                line.strip()
-                for line in f.readlines()
-                if line.strip() and not line.strip().startswith('#')
-            ]
+        skills = [
+            skill
+            for skill in (line.strip() for line in _read_bytes(text_path).decode('utf-8').splitlines())
+            if skill and not skill.startswith('#')
+        ]
 
         return {
             'skills': skills,
@@ -70,87 +144,194 @@ def load_skills_config(project_path: Path) -> Optional[Dict]:
 
 def parse_skill_frontmatter(content: str) -> Tuple[Optional[Dict], str]:
     """Parse skill frontmatter if present"""
-    frontmatter_match = re.match(r'^---\n([\s\S]*?)\n---\n', content)
+    if not content.startswith('---\n'):
+        return None, content
 
-    if not frontmatter_match:
+    end = content.find('\n---\n', 4)
+    if end < 0:
         return None, content
 
-    frontmatter_text = frontmatter_match.group(1)
-    content_without_frontmatter = content[len(frontmatter_match.group(0)):]
+    return _parse_frontmatter_text(content[4:end]), content[end + 5:]
+
+
+def parse_skill_frontmatter_bytes(raw_content: bytes) -> Tuple[Optional[Dict], bytes]:
+    """Parse skill frontmatter from raw file bytes, leaving the body undecoded"""
+    if not raw_content.startswith(b'---\n'):
+        return None, raw_content
+
+    end = raw_content.find(b'\n---\n', 4)
+    if end < 0:
+        return None, raw_content
+
+    return _parse_frontmatter_text(raw_content[4:end].decode('utf-8')), raw_content[end + 5:]
 
+
+def _parse_frontmatter_text(frontmatter_text: str) -> Dict:
+    """Parse the key/value lines between the frontmatter delimiters"""
     # Simple YAML parsing (basic implementation)
     frontmatter = {}
-    lines = frontmatter_text.split('\n')
-
-    for line in lines:
-        match = re.match(r'^(\w+):\s*(.+)$', line)
-        if match:
-            key = match.group(1)
-            value = match.group(2).strip()
-
-            # Handle arrays
-            if value.startswith('[') and value.endswith(']'):
-                value = [
-                    s.strip().strip('"\'')
-                    for s in value[1:-1].split(',')
-                ]
-
-            frontmatter[key] = value
-
-    return frontmatter, content_without_frontmatter
-
-
-def resolve_skill_dependencies(
-    skill_name: str,
-    all_skills: List[str],
-    resolved: Set[str] = None,
-    resolving: Set[str] = None
-) -> List[str]:
-    """Resolve skill dependencies"""
-    if resolved is None:
-        resolved = set()
-    if resolving is None:
-        resolving = set()
-
-    if skill_name in resolved:
-        return []
-    if skill_name in resolving:
-        print(f"{Colors.RED}✗ Circular dependency detected:{Colors.RESET} {skill_name}", file=sys.stderr)
-        return []
 
-    skill_path = SKILLS_DIR / f"{skill_name}.md"
-    if not skill_path.exists():
-        return []
+    for line in frontmatter_text.splitlines():
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
 
-    resolving.add(skill_name)
+        # Indented lines belong to nested values, which are not supported
+        key = key.rstrip()
+        if not key.isidentifier():
+            continue
 
-    with open(skill_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+        value = value.strip()
 
-    frontmatter, _ = parse_skill_frontmatter(content)
+        # Handle arrays
+        if len(value) >= 2 and value[0] == '[' and value[-1] == ']':
+            value = [
+                s.strip().strip('"\'')
+                for s in value[1:-1].split(',')
+            ]
 
-    dependencies = []
+        frontmatter[key] = value
 
-    if frontmatter and 'requires' in frontmatter:
-        requires = frontmatter['requires']
-        if not isinstance(requires, list):
-            requires = [requires]
+    return frontmatter
 
-        for dep in requires:
-            dependencies.extend(resolve_skill_dependencies(dep, all_skills, resolved, resolving))
 
-    dependencies.append(skill_name)
-    resolved.add(skill_name)
-    resolving.discard(skill_name)
+def _skill_path(skill_name: str) -> str:
+    """Return the path of a skill's markdown file"""
+    return os.path.join(_SKILLS_DIR_STR, skill_name + '.md')
 
-    return dependencies
 
+def _load_skill(skill_name: str) -> Tuple[bytes, Optional[Dict], bytes]:
+    """Read and parse a skill file once, reusing the result for later lookups"""
+    cached = _SKILL_CACHE.get(skill_name)
+    if cached is None:
+        raw_content = _read_bytes(_skill_path(skill_name))
+        if b'\r' in raw_content:
+            # Match text-mode universal newlines for files saved with CRLF
+            raw_content = raw_content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        frontmatter, content = parse_skill_frontmatter_bytes(raw_content)
+        cached = _SKILL_CACHE[skill_name] = (raw_content, frontmatter, content)
+    return cached
 
-def load_skills_for_project(
+
+def _scan_skills_dir() -> Set[str]:
+    """List the skill names available in the skills directory"""
+    try:
+        with os.scandir(_SKILLS_DIR_STR) as it:
+            return {
+                entry.name[:-3]
+                for entry in it
+                if entry.name.endswith('.md') and entry.is_file()
+            }
+    except FileNotFoundError:
+        return set()
+
+
+def _is_available(skill_name: str, available: Set[str]) -> bool:
+    """Check whether a skill file exists, stat-ing only names the scan did not list"""
+    if skill_name in available:
+        return True
+
+    # The scan misses files in subdirectories and names that only match on
+    # case-insensitive filesystems, so look those up directly
+    if os.path.isfile(_skill_path(skill_name)):
+        available.add(skill_name)
+        return True
+
+    return False
+
+
+def _skill_requires(skill_name: str, available: Set[str]) -> List[str]:
+    """Return the skills listed in a skill's `requires` frontmatter"""
+    if not _is_available(skill_name, available):
+        return []
+
+    _, frontmatter, _ = _load_skill(skill_name)
+    if not frontmatter or 'requires' not in frontmatter:
+        return []
+
+    requires = frontmatter['requires']
+    if not isinstance(requires, list):
+        requires = [requires]
+
+    # `requires: []` parses to [''] and a bare `requires:` to ''
+    return [name for name in requires if name]
+
+
+def _prefetch_skills(roots: List[str], available: Set[str]) -> None:
+    """Read the skill files reachable from roots concurrently, one dependency level at a time"""
+    seen: Set[str] = set()
+    pending = [name for name in dict.fromkeys(roots) if _is_available(name, available)]
+    if not pending:
+        return
+
+    while pending:
+        seen.update(pending)
+        if len(pending) >= PREFETCH_MIN_SKILLS:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(32, len(pending))) as executor:
+                list(executor.map(_load_skill, pending))
+
+        next_level = []
+        for skill_name in pending:
+            # Reads any file the pool skipped, then follows its requires
+            for dep in _skill_requires(skill_name, available):
+                if dep not in seen and _is_available(dep, available):
+                    seen.add(dep)
+                    next_level.append(dep)
+        pending = next_level
+
+
+def _topo_sort(roots: List[str], available: Set[str]) -> Tuple[List[str], List[List[str]]]:
+    """Order skills so dependencies come first, collecting any cycles found"""
+    color: Dict[str, int] = {}
+    order: List[str] = []
+    cycles: List[List[str]] = []
+
+    for root in roots:
+        if color.get(root, _WHITE) != _WHITE:
+            continue
+
+        color[root] = _GRAY
+        stack: List[Tuple[str, Iterator[str]]] = [(root, iter(_skill_requires(root, available)))]
+
+        while stack:
+            skill_name, deps = stack[-1]
+            for dep in deps:
+                state = color.get(dep, _WHITE)
+                if state == _WHITE:
+                    color[dep] = _GRAY
+                    stack.append((dep, iter(_skill_requires(dep, available))))
+                    break
+                if state == _GRAY:
+                    # Back edge: the cycle runs from dep's frame to the top of the stack
+                    path = [name for name, _ in stack]
+                    cycles.append(path[path.index(dep):] + [dep])
+            else:
+                stack.pop()
+                color[skill_name] = _BLACK
+                order.append(skill_name)
+
+    return order, cycles
+
+
+def resolve_skill_dependencies(skill_name: str, all_skills: Optional[List[str]] = None) -> List[str]:
+    """Resolve skill dependencies (all_skills is unused and kept for compatibility)"""
+    available = _scan_skills_dir()
+    order, cycles = _topo_sort([skill_name], available)
+
+    for cycle in cycles:
+        _report(f"{Colors.RED}✗ Circular dependency detected:{Colors.RESET} {' → '.join(cycle)}")
+    _flush_diagnostics()
+
+    # Like the recursive resolver this replaced, leave out skills without a file
+    return [name for name in order if _is_available(name, available)]
+
+
+def _load_skills(
     project_path: Optional[str] = None,
     options: Optional[Dict] = None
-) -> str:
-    """Load and combine skills for a project"""
+) -> Union[str, List[bytes]]:
+    """Load skills for a project as JSON text, or as a list of raw skill bodies"""
     if project_path is None:
         project_path = os.getcwd()
 
@@ -164,72 +345,88 @@ def load_skills_for_project(
 
     if not config:
         if not options['silent']:
-            print(f"{Colors.YELLOW}⚠{Colors.RESET} No {SKILLS_FILE} or {SKILLS_JSON_FILE} found in {project_path}", file=sys.stderr)
-        return json.dumps({'error': 'No skills configuration found'}) if options['json'] else ''
+            _report(f"{_WARN} No {SKILLS_FILE} or {SKILLS_JSON_FILE} found in {project_path}")
+        return _dumps({'error': 'No skills configuration found'}, pretty=False) if options['json'] else []
 
     if not config['skills']:
         if not options['silent']:
-            print(f"{Colors.YELLOW}⚠{Colors.RESET} No active skills found in configuration", file=sys.stderr)
-        return json.dumps({'error': 'No active skills'}) if options['json'] else ''
+            _report(f"{_WARN} No active skills found in configuration")
+        return _dumps({'error': 'No active skills'}, pretty=False) if options['json'] else []
 
     # Resolve all dependencies
-    all_skills_ordered = []
-    seen = set()
+    available = _scan_skills_dir()
+    _prefetch_skills(config['skills'], available)
+    all_skills_ordered, cycles = _topo_sort(config['skills'], available)
 
-    for skill in config['skills']:
-        dependencies = resolve_skill_dependencies(skill, config['skills'])
-        for dep in dependencies:
-            if dep not in seen:
-                all_skills_ordered.append(dep)
-                seen.add(dep)
+    if cycles and not options['silent']:
+        cycle_paths = ', '.join(' → '.join(cycle) for cycle in cycles)
+        _report(f"{Colors.RED}✗ Circular dependency detected:{Colors.RESET} {cycle_paths}")
 
     # Load each skill file
-    loaded_skills = []
-    missing_skills = []
+    loaded_skills = [name for name in all_skills_ordered if _is_available(name, available)]
+    missing_skills = [name for name in all_skills_ordered if not _is_available(name, available)]
     skills_content = []
     skills_metadata = []
 
-    for skill_name in all_skills_ordered:
-        skill_path = SKILLS_DIR / f"{skill_name}.md"
-
-        if skill_path.exists():
-            with open(skill_path, 'r', encoding='utf-8') as f:
-                raw_content = f.read()
-
-            frontmatter, content = parse_skill_frontmatter(raw_content)
-
-            skills_content.append(content)
-            loaded_skills.append(skill_name)
-
-            if options['json']:
-                skills_metadata.append({
-                    'name': skill_name,
-                    'path': str(skill_path),
-                    'frontmatter': frontmatter,
-                    'size': len(raw_content)
-                })
-        else:
-            missing_skills.append(skill_name)
+    if not options['json']:
+        # Bodies were split from their frontmatter when first read; nothing left to parse
+        skills_content = [_load_skill(skill_name)[2] for skill_name in loaded_skills]
+    else:
+        for skill_name in loaded_skills:
+            raw_content, frontmatter, _ = _load_skill(skill_name)
+            skills_metadata.append({
+                'name': skill_name,
+                'path': _skill_path(skill_name),
+                'frontmatter': frontmatter,
+                'size': len(raw_content.decode('utf-8'))
+            })
 
     # Report results to stderr
     if not options['silent']:
         if loaded_skills:
-            print(f"{Colors.GREEN}✓{Colors.RESET} Loaded skills: {', '.join(loaded_skills)}", file=sys.stderr)
+            _report(f"{_OK} Loaded skills: {', '.join(loaded_skills)}")
         if missing_skills:
-            print(f"{Colors.RED}✗{Colors.RESET} Missing skills: {', '.join(missing_skills)}", file=sys.stderr)
+            _report(f"{_ERR} Missing skills: {', '.join(missing_skills)}")
 
     # Return appropriate format
     if options['json']:
-        return json.dumps({
+        return _dumps({
             'project': str(project_path),
             'configuration': config,
             'loadedSkills': loaded_skills,
             'missingSkills': missing_skills,
             'skills': skills_metadata
-        }, indent=2)
+        }, pretty=not options.get('compact_json', False))
     else:
-        # Combine all skills with separator
-        return '\n\n---\n\n'.join(skills_content)
+        return skills_content
+
+
+def load_skills_for_project(
+    project_path: Optional[str] = None,
+    options: Optional[Dict] = None
+) -> str:
+    """Load and combine skills for a project"""
+    result = _load_skills(project_path, options)
+    _flush_diagnostics()
+    if isinstance(result, str):
+        return result
+
+    # Combine all skills with separator
+    return SKILL_SEPARATOR.encode('utf-8').join(result).decode('utf-8')
+
+
+def _write_skills(skills_content: List[bytes]) -> None:
+    """Write skill bodies to stdout one at a time instead of joining them first"""
+    separator = SKILL_SEPARATOR.encode('utf-8')
+    out = sys.stdout.buffer
+
+    for i, content in enumerate(skills_content):
+        if i:
+            out.write(separator)
+        out.write(content)
+
+    out.write(b'\n')
+    out.flush()
 
 
 def show_usage():
@@ -244,6 +441,7 @@ Load and combine skill files for Claude Code projects.
 
 {Colors.BRIGHT}Options:{Colors.RESET}
   --json          Output metadata in JSON format
+  --compact-json  Output JSON on a single line (implies --json)
   --silent        Suppress stderr output (only show content)
   --help, -h      Show this help message
 
@@ -264,37 +462,51 @@ Load and combine skill files for Claude Code projects.
 """)
 
 
+# Command-line flags and the options they enable
+_FLAGS = {
+    '--json': ('json',),
+    '--compact-json': ('json', 'compact_json'),
+    '--silent': ('silent',),
+}
+
+
 def main():
     """Main execution"""
     args = sys.argv[1:]
     options = {
         'json': False,
+        'compact_json': False,
         'silent': False
     }
 
     project_path = None
 
     # Parse arguments
-    for i, arg in enumerate(args):
+    for arg in args:
         if arg in ('--help', '-h'):
             show_usage()
             sys.exit(0)
-        elif arg == '--json':
-            options['json'] = True
-        elif arg == '--silent':
-            options['silent'] = True
+
+        keys = _FLAGS.get(arg)
+        if keys:
+            for key in keys:
+                options[key] = True
         elif not arg.startswith('-'):
-            project_path = os.path.abspath(arg)
+            project_path = arg if os.path.isabs(arg) else os.path.abspath(arg)
         else:
             print(f"{Colors.RED}Unknown option:{Colors.RESET} {arg}", file=sys.stderr)
             show_usage()
             sys.exit(1)
 
     # Load and output skills
-    result = load_skills_for_project(project_path, options)
+    result = _load_skills(project_path, options)
+    _flush_diagnostics()
 
-    if result:
+    if isinstance(result, str) and result:
         print(result)
+    elif not isinstance(result, str) and (len(result) > 1 or (result and result[0])):
+        # Same test as the joined string: one empty body means no output
+        _write_skills(result)
     elif not options['silent']:
         sys.exit(1)
 